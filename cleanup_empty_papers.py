@@ -15,8 +15,11 @@
 import os
 import json
 import logging
+from concurrent.futures import ThreadPoolExecutor
 from datetime import datetime
 
+from json_io import json_loads, json_dumps, write_file_atomic
+
 
 logging.basicConfig(
     level=logging.INFO,
@@ -30,13 +33,31 @@ PAPERS_DIR = os.path.join(ROOT_DIR, 'data', 'papers')
 INDEX_FILE = os.path.join(ROOT_DIR, 'data', 'index.json')
 
 
+PEEK_SIZE = 512
+MAX_WORKERS = 16
+
+
 def is_empty_daily_json(file_path: str) -> bool:
     try:
-        with open(file_path, 'r', encoding='utf-8') as f:
-            raw = f.read().strip()
-            if raw == '' or raw == '[]':
+        with open(file_path, 'rb') as f:
+            # 先只读取开头一小段：'[' 之后第一个非空白字节即可判定列表是否为空
+            prefix = f.read(PEEK_SIZE)
+            at_eof = len(prefix) < PEEK_SIZE
+            head = prefix.lstrip()
+            if not head and at_eof:
                 return True
-            data = json.loads(raw)
+            if head[:1] == b'[':
+                rest = head[1:].lstrip()
+                if rest[:1] == b']':
+                    if at_eof and not rest[1:].strip():
+                        return True
+                elif rest:
+                    return False
+            # 前缀无法判定时，回退为完整解析
+            raw = (prefix + f.read()).strip()
+            if raw == b'' or raw == b'[]':
+                return True
+            data = json_loads(raw)
             if isinstance(data, list) and len(data) == 0:
                 return True
             return False
@@ -64,8 +85,8 @@ def load_index() -> dict:
     if not os.path.exists(INDEX_FILE):
         return {}
     try:
-        with open(INDEX_FILE, 'r', encoding='utf-8') as f:
-            return json.load(f)
+        with open(INDEX_FILE, 'rb') as f:
+            return json_loads(f.read())
     except Exception as e:
         logger.warning(f"读取 index.json 失败，将以空对象处理: {e}")
         return {}
@@ -73,8 +94,7 @@ def load_index() -> dict:
 
 def save_index(index_obj: dict) -> None:
     try:
-        with open(INDEX_FILE, 'w', encoding='utf-8') as f:
-            json.dump(index_obj, f, ensure_ascii=False, indent=2)
+        write_file_atomic(INDEX_FILE, json_dumps(index_obj))
     except Exception as e:
         logger.error(f"写入 index.json 失败: {e}")
 
@@ -90,23 +110,32 @@ def main():
     removed_files: list[str] = []
     removed_dates: list[str] = []
 
-    for filename in os.listdir(PAPERS_DIR):
-        file_path = os.path.join(PAPERS_DIR, filename)
-        if not os.path.isfile(file_path):
-            continue
-        day = extract_date_from_filename(filename)
-        if not day:
+    # scandir 返回的条目自带文件类型信息，无需对每个文件再 stat 一次
+    candidates: list[tuple[str, str, str]] = []
+    with os.scandir(PAPERS_DIR) as it:
+        for entry in it:
+            if not entry.is_file():
+                continue
+            day = extract_date_from_filename(entry.name)
+            if day:
+                candidates.append((entry.name, entry.path, day))
+
+    # 并发读取判定是否为空；删除与 index 更新仍在主线程串行执行
+    with ThreadPoolExecutor(max_workers=MAX_WORKERS) as executor:
+        empty_flags = list(executor.map(is_empty_daily_json, [path for _, path, _ in candidates]))
+
+    for (filename, file_path, day), is_empty in zip(candidates, empty_flags):
+        if not is_empty:
             continue
-        if is_empty_daily_json(file_path):
-            try:
-                os.remove(file_path)
-                removed_files.append(filename)
-                if day in dates:
-                    dates.remove(day)
-                    removed_dates.append(day)
-                logger.info(f"删除空文件: {filename}")
-            except Exception as e:
-                logger.error(f"删除文件失败: {filename} - {e}")
+        try:
+            os.remove(file_path)
+            removed_files.append(filename)
+            if day in dates:
+                dates.remove(day)
+                removed_dates.append(day)
+            logger.info(f"删除空文件: {filename}")
+        except Exception as e:
+            logger.error(f"删除文件失败: {filename} - {e}")
 
     if removed_files:
         # 更新 index.json
@@ -3,24 +3,64 @@
 
 import os
 import json
+import bisect
 import requests
+from requests.adapters import HTTPAdapter
+from urllib3.util.retry import Retry
 import yaml
 import logging
 import argparse
 import re
+from collections import Counter
+from concurrent.futures import ThreadPoolExecutor
 from datetime import datetime, date
 from typing import Dict, List, Any, Optional
-from bs4 import BeautifulSoup
+import lxml.html
+
+from json_io import json_loads, json_dumps, write_file_atomic
 
 logging.basicConfig(format='[%(asctime)s %(levelname)s] %(message)s',
                     datefmt='%m/%d/%Y %H:%M:%S',
                     level=logging.INFO)
 
+# 解析列表页时反复使用的正则，预先编译（LISTING_DATE_RE直接匹配原始字节）
+LISTING_DATE_RE = re.compile(rb'Showing new listings for\s+(\w+,\s+\d{1,2}\s+\w+\s+\d{4})')
+# 单个学科分类，如 Sound (cs.SD)、High Energy Physics - Theory (hep-th)；不跨越分号和 "Subjects:" 的冒号
+SUBJECT_RE = re.compile(r'[^\s;:][^;:]*\([\w.\-]+\)')
+ABS_ID_RE = re.compile(r'/abs/(\d{4}\.\d{5})')
+TITLE_RE = re.compile(r'Title:\s*(.+)')
+
+def parse_html(html_content: bytes):
+    """用lxml直接解析arXiv页面的UTF-8字节（解析器不能跨线程共享，每次新建）"""
+    return lxml.html.document_fromstring(html_content, parser=lxml.html.HTMLParser(encoding='utf-8'))
+
+# 论文详情dd中需要提取的元素：(标签, class) -> 字段名
+DETAIL_CLASSES = {
+    ('div', 'list-title'): 'title',
+    ('div', 'list-authors'): 'authors',
+    ('div', 'list-subjects'): 'subjects',
+    ('p', 'mathjax'): 'abstract'
+}
+
+def find_detail_elements(dd) -> Dict[str, Any]:
+    """一次遍历dd的子孙节点，按class取出标题、作者、subjects和摘要元素（各取第一个）"""
+    found = {}
+    for element in dd.iter('div', 'p'):
+        for class_name in element.get('class', '').split():
+            key = DETAIL_CLASSES.get((element.tag, class_name))
+            if key is not None and key not in found:
+                found[key] = element
+        if len(found) == len(DETAIL_CLASSES):
+            break
+    return found
+
 class DailyPaperCollector:
-    def __init__(self, config_path: str = 'config.yaml', data_dir: str = 'data'):
+    def __init__(self, config_path: str = 'config.yaml', data_dir: str = 'data', cache_dir: str = '.http_cache'):
         self.data_dir = data_dir
         self.papers_dir = os.path.join(data_dir, 'papers')
         self.index_file = os.path.join(data_dir, 'index.json')
+        # 列表页的HTTP缓存（页面内容及其ETag/Last-Modified），用于条件请求
+        self.cache_dir = cache_dir
         
         # 新的爬取URL列表
         self.urls = [
@@ -29,225 +69,252 @@ class DailyPaperCollector:
             "https://arxiv.org/list/cs.SD/new"
         ]
         
+        # 复用同一会话，各URL共享keep-alive连接；遇到网关错误自动重试
+        self.session = requests.Session()
+        self.session.headers.update({
+            'User-Agent': 'Mozilla/5.0 (Windows NT 10.0; Win64; x64) AppleWebKit/537.36 (KHTML, like Gecko) Chrome/91.0.4472.124 Safari/537.36',
+            'Accept-Encoding': 'gzip, deflate'
+        })
+        retries = Retry(total=3, backoff_factor=0.5, status_forcelist=[502, 503, 504])
+        self.session.mount('https://', HTTPAdapter(pool_connections=4, pool_maxsize=4, max_retries=retries))
+        
         self.ensure_data_directories()
         
+        # 复用的读缓冲区，按需扩容，避免每次读文件都分配新的bytes对象
+        self._read_buf = bytearray(131072)
+        
+        # 索引缓存在内存中，修改后标记为脏，由flush_index统一写回
+        self._index = self.load_index()
+        self._index_dirty = False
+        
     def ensure_data_directories(self):
         """确保数据目录存在"""
         os.makedirs(self.data_dir, exist_ok=True)
         os.makedirs(self.papers_dir, exist_ok=True)
-        logging.info(f'Data directories ensured: {self.data_dir}, {self.papers_dir}')
+        os.makedirs(self.cache_dir, exist_ok=True)
+        logging.info(f'Data directories ensured: {self.data_dir}, {self.papers_dir}, {self.cache_dir}')
+    
+    def load_json_file(self, path: str) -> Any:
+        """将文件读入复用缓冲区并解析JSON"""
+        with open(path, 'rb', buffering=0) as f:
+            # 从已打开的文件取大小，避免打开前文件被其他进程替换导致只读到一部分
+            size = os.fstat(f.fileno()).st_size
+            if size > len(self._read_buf):
+                self._read_buf = bytearray(max(size, len(self._read_buf) * 2))
+            with memoryview(self._read_buf) as buf, buf[:size] as view:
+                n = f.readinto(view)
+                with view[:n] as data:
+                    return json_loads(data)
     
     def load_index(self) -> Dict:
         """加载索引文件"""
         if os.path.exists(self.index_file):
-            with open(self.index_file, 'r', encoding='utf-8') as f:
-                try:
-                    index = json.load(f)
-                    logging.info(f'Loaded index with {len(index.get("dates", []))} dates')
-                    return index
-                except json.JSONDecodeError:
-                    logging.warning('Invalid index file, starting fresh')
-                    return {'dates': [], 'total_papers': 0, 'last_updated': ''}
+            try:
+                index = self.load_json_file(self.index_file)
+                logging.info(f'Loaded index with {len(index.get("dates", []))} dates')
+                return index
+            except json.JSONDecodeError:
+                logging.warning('Invalid index file, starting fresh')
+                return {'dates': [], 'total_papers': 0, 'last_updated': ''}
         else:
             logging.info('No existing index file, starting fresh')
             return {'dates': [], 'total_papers': 0, 'last_updated': ''}
     
     def save_index(self, index: Dict):
         """保存索引文件"""
-        with open(self.index_file, 'w', encoding='utf-8') as f:
-            json.dump(index, f, ensure_ascii=False, indent=2)
+        write_file_atomic(self.index_file, json_dumps(index))
         logging.info(f'Saved index to {self.index_file}')
     
+    def flush_index(self):
+        """如果内存中的索引有修改，则写回索引文件"""
+        if self._index_dirty:
+            self.save_index(self._index)
+            self._index_dirty = False
+    
     def load_papers_for_date(self, date_str: str) -> List[Dict]:
         """加载指定日期的论文数据"""
         date_file = os.path.join(self.papers_dir, f'{date_str}.json')
         if os.path.exists(date_file):
-            with open(date_file, 'r', encoding='utf-8') as f:
-                try:
-                    papers = json.load(f)
-                    logging.info(f'Loaded {len(papers)} papers for date {date_str}')
-                    return papers
-                except json.JSONDecodeError:
-                    logging.warning(f'Invalid JSON file for date {date_str}')
-                    return []
+            try:
+                papers = self.load_json_file(date_file)
+                logging.info(f'Loaded {len(papers)} papers for date {date_str}')
+                return papers
+            except json.JSONDecodeError:
+                logging.warning(f'Invalid JSON file for date {date_str}')
+                return []
         else:
             logging.info(f'No existing data for date {date_str}')
             return []
     
-    def save_papers_for_date(self, date_str: str, papers: List[Dict]):
-        """保存指定日期的论文数据"""
+    def save_papers_for_date(self, date_str: str, papers: List[Dict], prev_count: Optional[int] = None):
+        """保存指定日期的论文数据，prev_count为该日期原有论文数（未知时读取旧文件获得）"""
         date_file = os.path.join(self.papers_dir, f'{date_str}.json')
-        with open(date_file, 'w', encoding='utf-8') as f:
-            json.dump(papers, f, ensure_ascii=False, indent=2)
+        if prev_count is None:
+            prev_count = len(self.load_papers_for_date(date_str))
+        
+        write_file_atomic(date_file, json_dumps(papers))
         logging.info(f'Saved {len(papers)} papers to {date_file}')
         
-        # 更新索引
-        index = self.load_index()
+        # 更新内存中的索引，由flush_index写回
+        index = self._index
         if date_str not in index['dates']:
-            index['dates'].append(date_str)
-            index['dates'].sort()  # 保持日期排序
-        
-        # 计算总论文数
-        total_papers = 0
-        for date in index['dates']:
-            date_papers = self.load_papers_for_date(date)
-            total_papers += len(date_papers)
+            bisect.insort(index['dates'], date_str)  # dates已有序，二分插入保持排序
         
-        index['total_papers'] = total_papers
+        # 增量更新总论文数：减去该日期原有数量，加上新数量
+        index['total_papers'] = index.get('total_papers', 0) - prev_count + len(papers)
         index['last_updated'] = datetime.now().strftime('%Y-%m-%d %H:%M:%S')
-        
-        self.save_index(index)
+        self._index_dirty = True
     
-    def fetch_page(self, url: str) -> Optional[str]:
-        """获取网页内容"""
+    def fetch_page(self, url: str) -> Optional[bytes]:
+        """获取网页原始字节内容，交由lxml直接解码，省去requests的编码探测
+        
+        带上次缓存的ETag/Last-Modified发起条件请求，页面未变化(304)时直接读取本地缓存。
+        """
+        cache_key = re.sub(r'[^A-Za-z0-9.]+', '_', url)
+        body_file = os.path.join(self.cache_dir, f'{cache_key}.html')
+        meta_file = os.path.join(self.cache_dir, f'{cache_key}.json')
         try:
-            headers = {
-                'User-Agent': 'Mozilla/5.0 (Windows NT 10.0; Win64; x64) AppleWebKit/537.36 (KHTML, like Gecko) Chrome/91.0.4472.124 Safari/537.36'
-            }
-            response = requests.get(url, headers=headers, timeout=30)
+            headers = {}
+            if os.path.exists(body_file) and os.path.exists(meta_file):
+                with open(meta_file, 'rb') as f:
+                    meta = json_loads(f.read())
+                if meta.get('etag'):
+                    headers['If-None-Match'] = meta['etag']
+                if meta.get('last_modified'):
+                    headers['If-Modified-Since'] = meta['last_modified']
+            
+            response = self.session.get(url, headers=headers, timeout=30)
+            if response.status_code == 304:
+                logging.info(f"Not modified, using cached page for {url}")
+                with open(body_file, 'rb') as f:
+                    return f.read()
             response.raise_for_status()
-            return response.text
+            
+            content = response.content
+            meta = {
+                'etag': response.headers.get('ETag'),
+                'last_modified': response.headers.get('Last-Modified')
+            }
+            if meta['etag'] or meta['last_modified']:
+                write_file_atomic(body_file, content)
+                write_file_atomic(meta_file, json_dumps(meta))
+            return content
         except Exception as e:
             logging.error(f"Error fetching {url}: {e}")
             return None
     
-    def extract_global_date(self, html_content: str) -> Optional[str]:
-        """从HTML中提取全局日期"""
-        soup = BeautifulSoup(html_content, 'html.parser')
-        
-        # 查找包含 "Showing new listings for" 的 h3 标签
-        h3_tag = soup.find('h3', string=re.compile(r'Showing new listings for'))
-        
-        if h3_tag:
-            text = h3_tag.get_text()
-            # 提取日期部分：Wednesday, 10 September 2025
-            date_match = re.search(r'Showing new listings for\s+(\w+,\s+\d{1,2}\s+\w+\s+\d{4})', text)
-            if date_match:
-                date_str = date_match.group(1)
-                try:
-                    # 解析格式：Wednesday, 10 September 2025
-                    parsed_date = datetime.strptime(date_str, '%A, %d %B %Y')
-                    return parsed_date.strftime('%Y-%m-%d')
-                except ValueError as e:
-                    logging.warning(f"Failed to parse date '{date_str}': {e}")
-        
-        # 如果找不到日期，返回 None
-        return None
+    def extract_global_date(self, html_content: bytes) -> Optional[str]:
+        """从HTML中提取全局日期（"Showing new listings for ..." 标题中的日期）"""
+        # 提取日期部分：Wednesday, 10 September 2025
+        date_match = LISTING_DATE_RE.search(html_content)
+        if date_match is None:
+            # 如果找不到日期，返回 None
+            return None
+        
+        date_str = date_match.group(1).decode('ascii', 'replace')
+        try:
+            # 解析格式：Wednesday, 10 September 2025
+            parsed_date = datetime.strptime(date_str, '%A, %d %B %Y')
+            return parsed_date.strftime('%Y-%m-%d')
+        except ValueError as e:
+            logging.warning(f"Failed to parse date '{date_str}': {e}")
+            return None
     
     def parse_subjects(self, subjects_div) -> List[str]:
         """解析subjects div，提取所有学科分类"""
-        subjects = []
-        
-        if not subjects_div:
-            return subjects
-        
-        # 获取div的完整文本内容
-        full_text = subjects_div.get_text()
-        
-        # 移除 "Subjects:" 标签
-        text = re.sub(r'Subjects:\s*', '', full_text)
-        
-        # 按分号分割，然后提取每个分类
-        parts = text.split(';')
-        
-        for part in parts:
-            part = part.strip()
-            if part and '(' in part and ')' in part:
-                # 提取完整的分类名称和代码
-                subjects.append(part)
+        if subjects_div is None:
+            return []
         
-        return subjects
+        # 对div的完整文本做一次正则扫描，直接得到各个 "名称 (代码)" 形式的分类
+        return SUBJECT_RE.findall(subjects_div.text_content())
     
     def extract_authors(self, authors_div) -> str:
         """从作者div中提取作者列表"""
-        if not authors_div:
+        if authors_div is None:
             return ""
         
-        # 提取所有作者链接的文本
-        author_links = authors_div.find_all('a')
-        authors = []
-        for link in author_links:
-            author_name = link.get_text().strip()
-            if author_name:
-                authors.append(author_name)
-        
-        return ", ".join(authors)
+        # 提取所有作者链接的文本，跳过空名字
+        names = [link.text_content().strip() for link in authors_div.iter('a')]
+        return ", ".join([name for name in names if name])
     
-    def parse_papers_from_html(self, html_content: str, global_date: str) -> List[Dict]:
+    def parse_papers_from_html(self, html_content: bytes, global_date: str) -> List[Dict]:
         """从HTML中解析论文信息，跳过Replacement submissions部分，其他都解析"""
-        soup = BeautifulSoup(html_content, 'html.parser')
+        doc = parse_html(html_content)
         papers = []
         
         # 查找所有 h3 标签和对应的内容
-        h3_tags = soup.find_all('h3')
+        h3_tags = list(doc.iter('h3'))
         paper_items = []
         
         for h3 in h3_tags:
-            section_text = h3.get_text().strip()
+            section_text = h3.text_content().strip()
             
-            # 跳过 "Replacement submissions" 部分
+            # "Replacement submissions" 是列表页的最后一个部分，遇到即可停止扫描
             if 'Replacement submissions' in section_text:
                 logging.info(f"Skipping section: {section_text}")
-                continue
+                break
             
             # 检查是否是论文列表的section（通常包含submissions字样）
-            if 'submissions' in section_text.lower() or 'cross-lists' in section_text.lower():
+            section_lower = section_text.lower()
+            if 'submissions' in section_lower or 'cross-lists' in section_lower:
                 logging.info(f"Processing section: {section_text}")
                 
                 # 查找该 h3 标签后的所有 dt 元素，直到遇到下一个 h3 标签
-                current_element = h3.next_sibling
+                current_element = h3.getnext()
                 
-                while current_element:
-                    if current_element.name == 'h3':
+                while current_element is not None:
+                    if current_element.tag == 'h3':
                         # 遇到下一个 h3 标签，停止查找
                         break
-                    elif current_element.name == 'dt':
+                    elif current_element.tag == 'dt':
                         # 找到 dt 元素，添加到列表中
                         paper_items.append(current_element)
-                    current_element = current_element.next_sibling
+                    current_element = current_element.getnext()
         
         logging.info(f"Found {len(paper_items)} papers in total (excluding Replacement submissions)")
         
         for dt in paper_items:
             try:
                 # 查找对应的dd元素（包含详细信息）
-                dd = dt.find_next_sibling('dd')
-                if not dd:
+                dd = next(dt.itersiblings('dd'), None)
+                if dd is None:
                     continue
                 
-                # 提取arXiv ID
-                arxiv_link = dt.find('a', href=re.compile(r'/abs/'))
-                if not arxiv_link:
-                    continue
-                
-                arxiv_id_match = re.search(r'(\d{4}\.\d{5})', arxiv_link.get('href', ''))
+                # 提取arXiv ID（取第一个 /abs/ 链接中的编号）
+                arxiv_id_match = None
+                for link in dt.iter('a'):
+                    arxiv_id_match = ABS_ID_RE.search(link.get('href', ''))
+                    if arxiv_id_match:
+                        break
                 if not arxiv_id_match:
                     continue
                 
                 paper_id = arxiv_id_match.group(1)
                 
+                details = find_detail_elements(dd)
+                
                 # 提取标题
-                title_div = dd.find('div', class_='list-title')
+                title_div = details.get('title')
                 title = ""
-                if title_div:
-                    title_text = title_div.get_text()
-                    title_match = re.search(r'Title:\s*(.+)', title_text)
+                if title_div is not None:
+                    title_text = title_div.text_content()
+                    title_match = TITLE_RE.search(title_text)
                     if title_match:
                         title = title_match.group(1).strip()
                 
                 # 提取作者
-                authors_div = dd.find('div', class_='list-authors')
+                authors_div = details.get('authors')
                 authors = self.extract_authors(authors_div)
                 
                 # 提取subjects
-                subjects_div = dd.find('div', class_='list-subjects')
+                subjects_div = details.get('subjects')
                 subjects = self.parse_subjects(subjects_div)
                 
                 # 提取摘要
                 abstract = ""
-                abstract_p = dd.find('p', class_='mathjax')
-                if abstract_p:
-                    abstract = abstract_p.get_text().strip()
+                abstract_p = details.get('abstract')
+                if abstract_p is not None:
+                    abstract = abstract_p.text_content().strip()
                 
                 # 构建论文信息
                 paper_info = {
@@ -298,40 +365,49 @@ class DailyPaperCollector:
         
         return papers
     
+    def merge_paper(self, all_papers: Dict[str, Dict], paper: Dict) -> List[str]:
+        """按paper_id将论文并入all_papers；论文已存在时原地追加缺少的subjects
+        
+        合并期间subjects以dict作为有序集合保存（O(1)判重且保持原顺序），
+        保存前需转换回列表。返回本次新加入的subjects，用于增量统计。
+        """
+        existing = all_papers.get(paper['paper_id'])
+        if existing is None:
+            paper['subjects'] = dict.fromkeys(paper['subjects'])
+            all_papers[paper['paper_id']] = paper
+            return list(paper['subjects'])
+        
+        new_subjects = [subject for subject in paper['subjects'] if subject not in existing['subjects']]
+        existing['subjects'].update(dict.fromkeys(new_subjects))
+        return new_subjects
+    
     def collect_daily_papers(self, target_date: date) -> List[Dict]:
         """收集指定日期的论文（从三个URL），跳过Replacement submissions"""
         date_str = target_date.strftime('%Y-%m-%d')
         logging.info(f"Collecting papers for date: {date_str}")
         
         all_papers = {}  # 使用dict去重，key为paper_id
+        subjects_stats = Counter()  # 合并时增量统计各subject的论文数
         
-        # 从三个URL收集论文
-        for url in self.urls:
-            papers = self.collect_papers_from_url(url, date_str)
-            
-            # 合并论文，避免重复
+        # 并发地从各URL收集论文（各请求互不依赖，耗时主要在网络等待）
+        with ThreadPoolExecutor(max_workers=len(self.urls)) as executor:
+            results = list(executor.map(lambda url: self.collect_papers_from_url(url, date_str), self.urls))
+        
+        # 按URL顺序合并论文，避免重复
+        for papers in results:
             for paper in papers:
-                paper_id = paper['paper_id']
-                if paper_id in all_papers:
-                    # 如果论文已存在，合并subjects
-                    existing_subjects = set(all_papers[paper_id]['subjects'])
-                    new_subjects = set(paper['subjects'])
-                    all_papers[paper_id]['subjects'] = list(existing_subjects | new_subjects)
-                else:
-                    all_papers[paper_id] = paper
+                subjects_stats.update(self.merge_paper(all_papers, paper))
         
         papers_list = list(all_papers.values())
+        for paper in papers_list:
+            paper['subjects'] = list(paper['subjects'])
         logging.info(f"Total unique papers collected: {len(papers_list)}")
         
         # 保存论文数据
         self.save_papers_for_date(date_str, papers_list)
+        self.flush_index()
         
         # 显示统计信息
-        subjects_stats = {}
-        for paper in papers_list:
-            for subject in paper['subjects']:
-                subjects_stats[subject] = subjects_stats.get(subject, 0) + 1
-        
         logging.info("Subjects distribution:")
         for subject, count in sorted(subjects_stats.items()):
             logging.info(f"  {subject}: {count} papers")
@@ -362,6 +438,7 @@ def main():
     # 创建收集器并运行
     collector = DailyPaperCollector(data_dir=args.data_dir)
     papers = collector.collect_daily_papers(target_date)
+    collector.flush_index()
     
     logging.info(f"Collection completed! Found {len(papers)} papers for {target_date}")
 
@@ -0,0 +1,38 @@
+#!/usr/bin/env python3
+# -*- coding: utf-8 -*-
+"""
+各脚本共用的JSON读写工具：优先使用orjson，未安装时回退到标准库json；
+输出格式与json.dump(ensure_ascii=False, indent=2)一致，写文件时原子替换。
+"""
+
+import os
+import json
+from typing import Any
+
+try:
+    import orjson
+except ImportError:  # 未安装orjson时回退到标准库json
+    orjson = None
+
+
+def json_loads(data) -> Any:
+    """解析JSON，优先使用orjson"""
+    if orjson is not None:
+        return orjson.loads(data)
+    # 标准库json不接受memoryview，先转换为bytes
+    return json.loads(data if isinstance(data, (str, bytes)) else bytes(data))
+
+
+def json_dumps(obj: Any) -> bytes:
+    """序列化为带2空格缩进的UTF-8 JSON，格式与json.dump(ensure_ascii=False, indent=2)一致"""
+    if orjson is not None:
+        return orjson.dumps(obj, option=orjson.OPT_INDENT_2 | orjson.OPT_NON_STR_KEYS)
+    return json.dumps(obj, ensure_ascii=False, indent=2).encode('utf-8')
+
+
+def write_file_atomic(path: str, data: bytes):
+    """先写入临时文件再原子替换，中断时不会留下写了一半的文件"""
+    tmp_path = path + '.tmp'
+    with open(tmp_path, 'wb', buffering=1 << 20) as f:
+        f.write(data)
+    os.replace(tmp_path, path)
@@ -2,52 +2,234 @@
 # -*- coding: utf-8 -*-
 
 import json
+import hashlib
+import sqlite3
 import requests
+from requests.adapters import HTTPAdapter
 import time
 import os
+import sys
 import yaml
 import argparse
-from typing import Dict, Any, List, Optional
+import re
+import threading
+import itertools
+import logging
+from concurrent.futures import ThreadPoolExecutor, as_completed
+from typing import Dict, Any, List, Optional, Pattern
 from datetime import datetime
 
+from json_io import json_loads, json_dumps, write_file_atomic
+
+try:
+    from yaml import CSafeLoader as YamlLoader
+except ImportError:  # 未编译libyaml时回退到纯Python实现
+    from yaml import SafeLoader as YamlLoader
+
+# 设置日志（输出到stdout，调度器执行成功时会把stdout记入scheduler.log）
+logging.basicConfig(format='[%(asctime)s %(levelname)s] %(message)s',
+                    datefmt='%m/%d/%Y %H:%M:%S',
+                    level=logging.INFO,
+                    stream=sys.stdout)
+
 # OpenRouter API配置
-API_KEY = value = os.environ["API_KEY"]
+# OPENROUTER_API_KEYS可用逗号分隔多个key，请求时轮流使用，各key的速率限制可以叠加；未设置时使用API_KEY
+API_KEYS = [key.strip() for key in os.environ.get("OPENROUTER_API_KEYS", "").split(",") if key.strip()] \
+    or [os.environ["API_KEY"]]
 BASE_URL = "https://openrouter.ai/api/v1/chat/completions"
 MODEL = "z-ai/glm-4.5-air:free"
+# 请求体中每次都相同的字段，请求时只需补上messages和max_tokens
+REQUEST_TEMPLATE = {
+    "model": MODEL,
+    "temperature": 0.3,
+    "reasoning": {"enabled": False}
+}
 
-def load_config(config_path: str = "config.yaml") -> Dict[str, List[str]]:
-    """加载配置文件中的topic、category候选列表和白名单subjects"""
+# 单篇与批量处理prompt共用的分类要求
+PAPER_TASK_DESCRIPTION = """分类要求：
+1. category是这个论文所属的大类（从Music, Speech, Image, Other中选择）
+2. topic是这篇论文所属的细分任务（从给定的topic列表中选择）
+3. 一篇论文可以有多个topic，但通常只有一个主要category
+4. 如果论文不完全符合任何预定义的分类，可以选择最接近的或选择"Other\""""
+
+# 每次请求处理的论文篇数上限
+BATCH_SIZE = 5
+# 每次请求中论文标题+摘要的总字符数上限，摘要较长时一批少放几篇，避免输出过长被截断
+BATCH_MAX_CHARS = 8000
+# 每处理多少篇论文保存一次文件
+SAVE_EVERY = 10
+# 同时进行中的请求数
+MAX_WORKERS = 4
+# 同一个key相邻两次请求发起的最小间隔（秒），避免触发API速率限制
+REQUEST_INTERVAL = 2
+# LLM处理结果缓存文件（位于数据目录下，不纳入版本库）
+CACHE_FILE = '.llm_cache.db'
+# 解析模型输出中JSON对象的解码器，raw_decode只解析一个完整对象，忽略其后的文字
+JSON_DECODER = json.JSONDecoder()
+
+class RateLimiter:
+    """保证相邻两次请求的发起时间至少间隔interval秒，可在多个线程间共享"""
+    
+    def __init__(self, interval: float):
+        self.interval = interval
+        self.lock = threading.Lock()
+        self.next_time = 0.0
+    
+    def wait(self):
+        with self.lock:
+            now = time.monotonic()
+            wait_time = self.next_time - now
+            self.next_time = max(now, self.next_time) + self.interval
+        if wait_time > 0:
+            time.sleep(wait_time)
+    
+    def pause(self, seconds: float):
+        """至少seconds秒内不再发起任何请求（所有线程共同退避）"""
+        with self.lock:
+            self.next_time = max(self.next_time, time.monotonic() + seconds)
+
+# 每个key各用一个限速器，无论各线程实际发出请求的先后，同一key的请求间隔都不小于REQUEST_INTERVAL
+rate_limiters = [RateLimiter(REQUEST_INTERVAL) for _ in API_KEYS]
+
+# 所有请求共用一个会话，复用与API服务器的keep-alive连接，省去每次请求的TCP/TLS握手
+session = requests.Session()
+session.headers.update({
+    "Content-Type": "application/json",
+    "HTTP-Referer": "https://github.com/your-repo",
+    "X-Title": "ArXiv Paper Classifier"
+})
+# 连接池最多保留16个连接，足以覆盖--workers指定的并发请求数
+session.mount('https://', HTTPAdapter(pool_connections=1, pool_maxsize=16))
+
+# 各key对应的(认证请求头, 限速器)，按轮询顺序取用
+api_slots = itertools.cycle([
+    ({"Authorization": f"Bearer {key}"}, limiter) for key, limiter in zip(API_KEYS, rate_limiters)
+])
+api_slots_lock = threading.Lock()
+
+def load_config(config_path: str = "config.yaml") -> Dict[str, Any]:
+    """加载配置文件中的topic、category候选列表和白名单subjects
+    
+    all_topic_set/all_category_set为候选列表对应的集合，供校验结果时O(1)查找。
+    """
     try:
         with open(config_path, 'r', encoding='utf-8') as f:
-            config = yaml.safe_load(f)
+            config = yaml.load(f, Loader=YamlLoader)
+        all_topic = config.get('all_topic', [])
+        all_category = config.get('all_category', [])
         return {
-            'all_topic': config.get('all_topic', []),
-            'all_category': config.get('all_category', []),
+            'all_topic': all_topic,
+            'all_category': all_category,
+            'all_topic_set': set(all_topic),
+            'all_category_set': set(all_category),
             'whitelist_subjects': config.get('whitelist_subjects', [])
         }
     except Exception as e:
-        print(f"加载配置文件错误: {e}")
-        return {'all_topic': [], 'all_category': [], 'whitelist_subjects': []}
+        logging.error(f"加载配置文件错误: {e}")
+        return {'all_topic': [], 'all_category': [], 'all_topic_set': set(), 'all_category_set': set(),
+                'whitelist_subjects': []}
 
-def is_paper_in_whitelist(paper: Dict[str, Any], whitelist_subjects: List[str]) -> bool:
+def compile_whitelist(whitelist_subjects: List[str]) -> Optional[Pattern]:
+    """将白名单subjects编译为一个正则，对每个subject只需扫描一次；白名单为空时返回None"""
+    if not whitelist_subjects:
+        return None
+    return re.compile('|'.join(re.escape(w) for w in whitelist_subjects))
+
+def is_paper_in_whitelist(paper: Dict[str, Any], whitelist_re: Optional[Pattern]) -> bool:
     """
     检查论文是否在白名单subjects中
     
     Args:
         paper: 论文信息字典
-        whitelist_subjects: 白名单subjects列表
+        whitelist_re: 由compile_whitelist编译的白名单正则
     
     Returns:
         如果论文包含任何白名单subject则返回True
     """
-    paper_subjects = paper.get('subjects', [])
+    if whitelist_re is None:
+        return False
     
-    for subject in paper_subjects:
-        for whitelist_subject in whitelist_subjects:
-            if whitelist_subject in subject:
-                return True
+    return any(whitelist_re.search(subject) for subject in paper.get('subjects', []))
+
+def needs_processing(paper: Dict[str, Any]) -> bool:
+    """论文是否还需要翻译或分类：中文标题、中文摘要、topic、category任一为空（None、空串或空列表）"""
+    return not (paper.get("paper_title_zh") and paper.get("paper_abstract_zh")
+                and paper.get("topic") and paper.get("category"))
+
+def empty_result() -> Dict[str, Any]:
+    """处理失败时返回的空结果"""
+    return {"paper_title_zh": "", "paper_abstract_zh": "", "topic": [], "category": []}
+
+def backoff_if_rate_limited(error: Exception, attempt: int):
+    """遇到速率限制(HTTP 429)时，按重试次数递增暂停所有并发请求"""
+    response = getattr(error, 'response', None)
+    if response is not None and response.status_code == 429:
+        wait_time = (attempt + 1) * 10  # 递增等待时间
+        logging.warning(f"遇到速率限制，等待 {wait_time} 秒后重试...")
+        for limiter in rate_limiters:
+            limiter.pause(wait_time)
+
+def request_llm(prompt: str, max_tokens: int = 1000) -> str:
+    """调用LLM API，返回模型输出的文本内容"""
+    data = {**REQUEST_TEMPLATE, "messages": [{"role": "user", "content": prompt}], "max_tokens": max_tokens}
+    
+    with api_slots_lock:
+        headers, limiter = next(api_slots)
     
-    return False
+    limiter.wait()
+    response = session.post(BASE_URL, headers=headers, json=data, timeout=60)
+    response.raise_for_status()
+    
+    result = response.json()
+    logging.debug(result)
+    return result['choices'][0]['message']['content']
+
+def parse_json_response(content: str) -> Any:
+    """从模型输出中解析第一个JSON对象（可能包含在代码块中，前后可有其他文字）"""
+    start = content.find('{')
+    if start == -1:
+        raise json.JSONDecodeError("模型输出中没有JSON对象", content, 0)
+    result, _ = JSON_DECODER.raw_decode(content, start)
+    return result
+
+def normalize_result(result_data: Dict[str, Any], config: Dict[str, List[str]]) -> Dict[str, Any]:
+    """整理单篇论文的LLM结果，只保留候选列表中的topic和category"""
+    # 提取翻译结果
+    paper_title_zh = result_data.get("paper_title_zh", "")
+    paper_abstract_zh = result_data.get("paper_abstract_zh", "")
+    
+    # 验证分类结果
+    topic = result_data.get("topic", [])
+    category = result_data.get("category", [])
+    
+    # 确保topic和category是列表
+    if not isinstance(topic, list):
+        topic = [topic] if topic else []
+    if not isinstance(category, list):
+        category = [category] if category else []
+    
+    # 验证topic是否在候选列表中（模型可能返回嵌套列表等非字符串元素，直接丢弃）
+    valid_topics = []
+    for t in topic:
+        if isinstance(t, str) and t in config['all_topic_set']:
+            valid_topics.append(t)
+        else:
+            logging.warning(f"topic '{t}' 不在候选列表中")
+    
+    # 验证category是否在候选列表中
+    valid_categories = []
+    for c in category:
+        if isinstance(c, str) and c in config['all_category_set']:
+            valid_categories.append(c)
+        else:
+            logging.warning(f"category '{c}' 不在候选列表中")
+    
+    return {
+        "paper_title_zh": paper_title_zh,
+        "paper_abstract_zh": paper_abstract_zh,
+        "topic": valid_topics,
+        "category": valid_categories
+    }
 
 def process_paper_complete(paper: Dict[str, Any], config: Dict[str, List[str]]) -> Dict[str, Any]:
     """
@@ -76,11 +258,7 @@ def process_paper_complete(paper: Dict[str, Any], config: Dict[str, List[str]])
 可选的topic列表：{config['all_topic']}
 可选的category列表：{config['all_category']}
 
-分类要求：
-1. category是这个论文所属的大类（从Music, Speech, Image, Other中选择）
-2. topic是这篇论文所属的细分任务（从给定的topic列表中选择）
-3. 一篇论文可以有多个topic，但通常只有一个主要category
-4. 如果论文不完全符合任何预定义的分类，可以选择最接近的或选择"Other"
+{PAPER_TASK_DESCRIPTION}
 
 请以JSON格式返回结果：
 {{
@@ -91,146 +269,239 @@ def process_paper_complete(paper: Dict[str, Any], config: Dict[str, List[str]])
 }}
 请勿返回特殊字符，保证JSON格式标准可解析
 """
-
-    headers = {
-        "Authorization": f"Bearer {API_KEY}",
-        "Content-Type": "application/json",
-        "HTTP-Referer": "https://github.com/your-repo",
-        "X-Title": "ArXiv Paper Classifier"
-    }
-    
-    data = {
-        "model": MODEL,
-        "messages": [
-            {
-                "role": "user",
-                "content": prompt
-            }
-        ],
-        "temperature": 0.3,
-        "max_tokens": 1000,
-        "reasoning": {"enabled": False}
-    }
     
     # 添加重试机制
     max_retries = 3
     for attempt in range(max_retries):
         try:
-            response = requests.post(BASE_URL, headers=headers, json=data, timeout=60)
-            response.raise_for_status()
-            
-            result = response.json()
-            print(result)
-            content = result['choices'][0]['message']['content']
+            content = request_llm(prompt)
             
             # 尝试解析JSON响应
             try:
-                # 提取JSON部分（可能包含在代码块中）
-                if '```json' in content:
-                    json_start = content.find('```json') + 7
-                    json_end = content.find('```', json_start)
-                    json_content = content[json_start:json_end].strip()
-                elif '{' in content and '}' in content:
-                    json_start = content.find('{')
-                    json_end = content.rfind('}') + 1
-                    json_content = content[json_start:json_end]
-                else:
-                    json_content = content
-                
-                result_data = json.loads(json_content)
-                
-                # 提取翻译结果
-                paper_title_zh = result_data.get("paper_title_zh", "")
-                paper_abstract_zh = result_data.get("paper_abstract_zh", "")
-                
-                # 验证分类结果
-                topic = result_data.get("topic", [])
-                category = result_data.get("category", [])
-                
-                # 确保topic和category是列表
-                if not isinstance(topic, list):
-                    topic = [topic] if topic else []
-                if not isinstance(category, list):
-                    category = [category] if category else []
-                
-                # 验证topic是否在候选列表中
-                valid_topics = []
-                for t in topic:
-                    if t in config['all_topic']:
-                        valid_topics.append(t)
-                    else:
-                        print(f"警告：topic '{t}' 不在候选列表中")
-                
-                # 验证category是否在候选列表中
-                valid_categories = []
-                for c in category:
-                    if c in config['all_category']:
-                        valid_categories.append(c)
-                    else:
-                        print(f"警告：category '{c}' 不在候选列表中")
-                
-                return {
-                    "paper_title_zh": paper_title_zh,
-                    "paper_abstract_zh": paper_abstract_zh,
-                    "topic": valid_topics,
-                    "category": valid_categories
-                }
+                result_data = parse_json_response(content)
+                return normalize_result(result_data, config)
                 
             except json.JSONDecodeError as e:
-                print(f"JSON解析错误 (尝试 {attempt+1}/{max_retries}): {e}")
+                logging.warning(f"JSON解析错误 (尝试 {attempt+1}/{max_retries}): {e}")
                 if attempt == max_retries - 1:
-                    print(f"原始响应: {content}")
-                    return {"paper_title_zh": "", "paper_abstract_zh": "", "topic": [], "category": []}
+                    logging.warning(f"原始响应: {content}")
+                    return empty_result()
                 
-        # except requests.exceptions.RequestException as e:
-        #     print(f"API请求错误 (尝试 {attempt+1}/{max_retries}): {e}")
-        #     if "429" in str(e):  # 速率限制错误
-        #         wait_time = (attempt + 1) * 10  # 递增等待时间
-        #         print(f"遇到速率限制，等待 {wait_time} 秒后重试...")
-        #         time.sleep(wait_time)
-        #     elif attempt == max_retries - 1:
-        #         return {"paper_title_zh": "", "paper_abstract_zh": "", "topic": [], "category": []}
         except Exception as e:
-            print(f"未知错误 (尝试 {attempt+1}/{max_retries}): {e}")
+            logging.warning(f"未知错误 (尝试 {attempt+1}/{max_retries}): {e}")
             if attempt == max_retries - 1:
-                return {"paper_title_zh": "", "paper_abstract_zh": "", "topic": [], "category": []}
+                return empty_result()
+            backoff_if_rate_limited(e, attempt)
     
-    return {"paper_title_zh": "", "paper_abstract_zh": "", "topic": [], "category": []}
+    return empty_result()
+
+def process_papers_batch(papers: List[Dict[str, Any]], config: Dict[str, List[str]]) -> List[Dict[str, Any]]:
+    """
+    在一次LLM请求中处理多篇论文（翻译+分类），摊薄每次请求的网络开销
+    
+    Args:
+        papers: 论文信息字典列表
+        config: 包含候选topic和category列表的配置
+    
+    Returns:
+        与papers按顺序一一对应的结果列表；批量结果无法解析时逐篇回退处理
+    """
+    if len(papers) == 1:
+        return [process_paper_complete(papers[0], config)]
+    
+    # 论文信息序列化为紧凑JSON：标题摘要中的引号、换行等被正确转义，短键名也减少了输入token
+    papers_json = json.dumps(
+        [
+            {"id": i, "t": paper.get("paper_title", ""), "a": paper.get("paper_abstract", ""),
+             "s": paper.get("subjects", [])}
+            for i, paper in enumerate(papers, 1)
+        ],
+        ensure_ascii=False, separators=(',', ':')
+    )
+    
+    prompt = f"""
+请对以下 {len(papers)} 篇论文逐篇进行完整处理，包括翻译和分类：
+
+1. 将每篇论文的英文标题和摘要翻译成中文
+2. 根据论文内容为每篇论文分配合适的topic和category
+
+论文信息（JSON数组，id为论文编号，t为标题，a为摘要，s为学科分类）：
+{papers_json}
+
+可选的topic列表：{config['all_topic']}
+可选的category列表：{config['all_category']}
+
+{PAPER_TASK_DESCRIPTION}
+
+请以JSON格式返回结果，results数组按论文id从1到{len(papers)}的顺序排列，共 {len(papers)} 项：
+{{
+  "results": [
+    {{
+      "paper_title_zh": "中文标题",
+      "paper_abstract_zh": "中文摘要",
+      "topic": ["选择的topic1", "选择的topic2"],
+      "category": ["选择的category"]
+    }}
+  ]
+}}
+请勿返回特殊字符，保证JSON格式标准可解析
+"""
+    
+    max_retries = 3
+    for attempt in range(max_retries):
+        try:
+            content = request_llm(prompt, max_tokens=1000 * len(papers))
+        except Exception as e:
+            logging.warning(f"批量处理错误 (尝试 {attempt+1}/{max_retries}): {e}")
+            backoff_if_rate_limited(e, attempt)
+            continue
+        
+        try:
+            result_data = parse_json_response(content)
+            results = result_data.get("results") if isinstance(result_data, dict) else None
+            if not isinstance(results, list) or len(results) != len(papers):
+                raise ValueError(f"结果数量与论文数量不一致: 期望 {len(papers)} 项")
+            return [normalize_result(item if isinstance(item, dict) else {}, config) for item in results]
+        except (ValueError, TypeError) as e:
+            # 输出格式错误通常不是偶发问题，重试同一批次多半仍然失败，改为逐篇处理
+            logging.warning(f"批量结果解析错误: {e}，改为逐篇处理")
+            return [process_paper_complete(paper, config) for paper in papers]
+    
+    # 请求多次失败（API不可用或持续限速）时逐篇重试只会更慢，本批留待下次运行处理
+    logging.warning(f"批量请求失败，本批 {len(papers)} 篇留待下次处理")
+    return [empty_result() for _ in papers]
+
+class ResultCache:
+    """LLM处理结果的本地缓存，以标题+摘要的sha256为键，标题摘要未变的论文无需重复请求"""
+    
+    def __init__(self, path: str):
+        self.conn = sqlite3.connect(path)
+        self.conn.execute('PRAGMA journal_mode=WAL')
+        self.conn.execute('CREATE TABLE IF NOT EXISTS results (hash TEXT PRIMARY KEY, result TEXT NOT NULL)')
+    
+    @staticmethod
+    def key(paper: Dict[str, Any]) -> str:
+        text = f"{paper.get('paper_title', '')}\0{paper.get('paper_abstract', '')}"
+        return hashlib.sha256(text.encode('utf-8')).hexdigest()
+    
+    def get(self, key: str) -> Optional[Dict[str, Any]]:
+        row = self.conn.execute('SELECT result FROM results WHERE hash = ?', (key,)).fetchone()
+        return json_loads(row[0]) if row else None
+    
+    def put_many(self, items):
+        """保存(键, 结果)对，只缓存翻译和分类都完整的结果"""
+        rows = [
+            (key, json.dumps(result, ensure_ascii=False))
+            for key, result in items
+            if all(result[field] for field in ("paper_title_zh", "paper_abstract_zh", "topic", "category"))
+        ]
+        if rows:
+            with self.conn:
+                self.conn.executemany('INSERT OR REPLACE INTO results (hash, result) VALUES (?, ?)', rows)
+    
+    def close(self):
+        self.conn.close()
+
+def apply_result(paper: Dict[str, Any], result: Dict[str, Any], whitelist_re: Optional[Pattern]) -> bool:
+    """将LLM结果写入论文，返回该论文是否应被过滤删除"""
+    # 更新论文信息
+    if result["paper_title_zh"]:
+        paper["paper_title_zh"] = result["paper_title_zh"]
+    if result["paper_abstract_zh"]:
+        paper["paper_abstract_zh"] = result["paper_abstract_zh"]
+    if result["topic"]:
+        paper["topic"] = result["topic"]
+    if result["category"]:
+        paper["category"] = result["category"]
+    
+    logging.debug(f"处理结果 - Topic: {paper.get('topic', [])}, Category: {paper.get('category', [])}")
+    if result["paper_title_zh"]:
+        logging.debug(f"中文标题: {result['paper_title_zh'][:50]}...")
+    
+    # 检查是否需要过滤
+    is_whitelisted = is_paper_in_whitelist(paper, whitelist_re)
+    
+    # 过滤条件：非白名单论文且满足以下任一条件
+    # 1. category仅有Other（即category列表只包含"Other"一个元素）
+    # 2. topic仅有Other（即topic列表只包含"Other"一个元素）
+    paper_topics = paper.get('topic', [])
+    paper_categories = paper.get('category', [])
+    
+    should_filter = (not is_whitelisted and 
+                   (paper_categories == ['Other'] or 
+                    paper_topics == ['Other']))
+    
+    if should_filter:
+        if paper_categories == ['Other']:
+            logging.info(f"⚠️ 论文被过滤并删除（非白名单且category仅为Other）")
+        elif paper_topics == ['Other']:
+            logging.info(f"⚠️ 论文被过滤并删除（非白名单且topic仅为Other）")
+    return should_filter
+
+def pack_batches(items: List[Any], item_chars: List[int], max_items: int,
+                 max_chars: int = BATCH_MAX_CHARS) -> List[List[Any]]:
+    """按顺序贪心打包：每批不超过max_items项，且总字符数不超过max_chars（单项超长时独占一批）"""
+    batches = []
+    batch, batch_chars = [], 0
+    for item, chars in zip(items, item_chars):
+        if batch and (len(batch) >= max_items or batch_chars + chars > max_chars):
+            batches.append(batch)
+            batch, batch_chars = [], 0
+        batch.append(item)
+        batch_chars += chars
+    if batch:
+        batches.append(batch)
+    return batches
 
 def load_index(data_dir: str) -> Dict[str, Any]:
     """加载索引文件"""
     index_file = os.path.join(data_dir, 'index.json')
     try:
-        with open(index_file, 'r', encoding='utf-8') as f:
-            return json.load(f)
+        with open(index_file, 'rb') as f:
+            return json_loads(f.read())
     except Exception as e:
-        print(f"加载索引文件错误: {e}")
+        logging.error(f"加载索引文件错误: {e}")
         return {'dates': [], 'total_papers': 0, 'last_updated': ''}
 
-def load_papers_for_date(data_dir: str, date_str: str) -> List[Dict]:
-    """加载指定日期的论文数据"""
-    papers_dir = os.path.join(data_dir, 'papers')
+def load_papers_for_date(papers_dir: str, date_str: str) -> List[Dict]:
+    """加载papers_dir下指定日期的论文数据"""
     date_file = os.path.join(papers_dir, f'{date_str}.json')
     try:
-        with open(date_file, 'r', encoding='utf-8') as f:
-            return json.load(f)
+        with open(date_file, 'rb') as f:
+            return json_loads(f.read())
     except Exception as e:
-        print(f"加载日期 {date_str} 的论文数据错误: {e}")
+        logging.error(f"加载日期 {date_str} 的论文数据错误: {e}")
         return []
 
-def save_papers_for_date(data_dir: str, date_str: str, papers: List[Dict]):
-    """保存指定日期的论文数据"""
-    papers_dir = os.path.join(data_dir, 'papers')
-    os.makedirs(papers_dir, exist_ok=True)
+def save_index(data_dir: str, index: Dict[str, Any]):
+    """保存索引文件"""
+    index_file = os.path.join(data_dir, 'index.json')
+    try:
+        write_file_atomic(index_file, json_dumps(index))
+    except Exception as e:
+        logging.error(f"保存索引文件错误: {e}")
+
+def save_papers_for_date(papers_dir: str, date_str: str, papers: List[Dict],
+                         index: Optional[Dict[str, Any]] = None, prev_count: int = 0):
+    """保存指定日期的论文数据到papers_dir（目录由调用方预先创建）
+    
+    传入index时按论文数变化（prev_count为该日期上次保存时的论文数）更新总论文数，
+    并紧接着写回papers_dir上一级的index.json，进程中途被杀也不会使总数与日期文件不一致。
+    """
     date_file = os.path.join(papers_dir, f'{date_str}.json')
     try:
-        with open(date_file, 'w', encoding='utf-8') as f:
-            json.dump(papers, f, ensure_ascii=False, indent=2)
-        print(f"日期 {date_str} 的论文数据已保存到 {date_file}")
+        write_file_atomic(date_file, json_dumps(papers))
+        logging.info(f"日期 {date_str} 的论文数据已保存到 {date_file}")
     except Exception as e:
-        print(f"保存日期 {date_str} 的论文数据错误: {e}")
+        logging.error(f"保存日期 {date_str} 的论文数据错误: {e}")
+        return
+    
+    if index is not None and len(papers) != prev_count:
+        index['total_papers'] = index.get('total_papers', 0) - prev_count + len(papers)
+        save_index(os.path.dirname(papers_dir), index)
 
-def process_papers_classification(data_dir: str = "data", config_path: str = "config.yaml", target_date: str = None):
+def process_papers_classification(data_dir: str = "data", config_path: str = "config.yaml", target_date: str = None,
+                                  batch_size: int = BATCH_SIZE, workers: int = MAX_WORKERS):
     """
     为论文进行完整处理：翻译标题和摘要，补全topic和category分类
     
@@ -238,149 +509,153 @@ def process_papers_classification(data_dir: str = "data", config_path: str = "co
         data_dir: 数据目录路径
         config_path: 配置文件路径
         target_date: 目标日期，格式为YYYY-MM-DD，如果为None则处理所有日期
+        batch_size: 每次LLM请求处理的论文篇数上限（同时受BATCH_MAX_CHARS限制）
+        workers: 同时进行中的LLM请求数
     """
     # 确保数据目录存在
     if not os.path.exists(data_dir):
-        print(f"数据目录 {data_dir} 不存在")
+        logging.error(f"数据目录 {data_dir} 不存在")
         return
     
     # 加载配置
     config = load_config(config_path)
     if not config['all_topic'] or not config['all_category']:
-        print("配置文件中缺少topic或category列表")
+        logging.error("配置文件中缺少topic或category列表")
         return
     
-    print(f"可用的topic: {config['all_topic']}")
-    print(f"可用的category: {config['all_category']}")
-    print(f"白名单subjects: {config['whitelist_subjects']}")
+    logging.info(f"可用的topic: {config['all_topic']}")
+    logging.info(f"可用的category: {config['all_category']}")
+    logging.info(f"白名单subjects: {config['whitelist_subjects']}")
+    whitelist_re = compile_whitelist(config['whitelist_subjects'])
     
-    # 加载索引
+    # 加载索引（只加载一次，各日期保存时在内存中更新并随日期文件一起写回）
     index = load_index(data_dir)
     dates = index.get('dates', [])
     
     if not dates:
-        print("没有找到任何日期数据")
+        logging.error("没有找到任何日期数据")
         return
     
+    papers_dir = os.path.join(data_dir, 'papers')
+    os.makedirs(papers_dir, exist_ok=True)
+    
     # 如果指定了目标日期，只处理该日期
     if target_date:
         if target_date not in dates:
-            print(f"指定的日期 {target_date} 不存在于数据中")
+            logging.error(f"指定的日期 {target_date} 不存在于数据中")
             return
         dates = [target_date]
     
-    print(f"将处理以下日期: {dates}")
+    logging.info(f"将处理以下日期: {dates}")
     
-    # 逐个日期处理
-    for date_str in dates:
-        print(f"\n开始处理日期: {date_str}")
-        papers = load_papers_for_date(data_dir, date_str)
-        
-        if not papers:
-            print(f"日期 {date_str} 没有论文数据")
-            continue
-        
-        # 统计需要处理的论文（翻译或分类）
-        papers_to_process = []
-        for i, paper in enumerate(papers):
-            needs_translation = (
-                not paper.get("paper_title_zh") or 
-                not paper.get("paper_abstract_zh") or
-                paper.get("paper_title_zh") == "" or 
-                paper.get("paper_abstract_zh") == ""
-            )
+    cache = ResultCache(os.path.join(data_dir, CACHE_FILE))
+    try:
+        # 逐个日期处理
+        for date_str in dates:
+            logging.info(f"开始处理日期: {date_str}")
+            papers = load_papers_for_date(papers_dir, date_str)
             
-            needs_classification = (
-                not paper.get("topic") or 
-                not paper.get("category") or
-                (isinstance(paper.get("topic"), list) and len(paper.get("topic")) == 0) or
-                (isinstance(paper.get("category"), list) and len(paper.get("category")) == 0)
-            )
+            if not papers:
+                logging.info(f"日期 {date_str} 没有论文数据")
+                continue
             
-            if needs_translation or needs_classification:
-                papers_to_process.append(i)
-        
-        total_to_process = len(papers_to_process)
-        print(f"找到 {total_to_process} 个需要处理的论文条目（共 {len(papers)} 个）")
-        
-        if total_to_process == 0:
-            print(f"日期 {date_str} 的所有论文都已处理完成")
-            continue
-        
-        processed_count = 0
-        filtered_count = 0
-        
-        # 创建论文副本用于操作，原始papers用于遍历
-        papers_copy = papers.copy()
-        
-        # 逐个处理论文
-        for paper_idx in papers_to_process:
-            paper = papers[paper_idx]  # 从原始列表获取论文
+            # 统计需要处理的论文（翻译或分类）
+            papers_to_process = [i for i, paper in enumerate(papers) if needs_processing(paper)]
             
-            print(f"\n处理论文 {processed_count + 1}/{total_to_process}")
-            print(f"标题: {paper.get('paper_title', '')[:80]}...")
+            total_to_process = len(papers_to_process)
+            logging.info(f"找到 {total_to_process} 个需要处理的论文条目（共 {len(papers)} 个）")
             
-            # 调用完整处理API（翻译+分类）
-            result = process_paper_complete(paper, config)
+            if total_to_process == 0:
+                logging.info(f"日期 {date_str} 的所有论文都已处理完成")
+                continue
             
-            # 在副本中找到对应的论文并更新
-            for i, copy_paper in enumerate(papers_copy):
-                if copy_paper.get('paper_id') == paper.get('paper_id'):
-                    # 更新论文信息
-                    if result["paper_title_zh"]:
-                        papers_copy[i]["paper_title_zh"] = result["paper_title_zh"]
-                    if result["paper_abstract_zh"]:
-                        papers_copy[i]["paper_abstract_zh"] = result["paper_abstract_zh"]
-                    if result["topic"]:
-                        papers_copy[i]["topic"] = result["topic"]
-                    if result["category"]:
-                        papers_copy[i]["category"] = result["category"]
-                    
-                    processed_count += 1
-                    
-                    print(f"处理结果 - Topic: {papers_copy[i].get('topic', [])}, Category: {papers_copy[i].get('category', [])}")
-                    if result["paper_title_zh"]:
-                        print(f"中文标题: {result['paper_title_zh'][:50]}...")
-                    
-                    # 检查是否需要过滤
-                    is_whitelisted = is_paper_in_whitelist(papers_copy[i], config['whitelist_subjects'])
-                    
-                    # 过滤条件：非白名单论文且满足以下任一条件
-                    # 1. category仅有Other（即category列表只包含"Other"一个元素）
-                    # 2. topic仅有Other（即topic列表只包含"Other"一个元素）
-                    paper_topics = papers_copy[i].get('topic', [])
-                    paper_categories = papers_copy[i].get('category', [])
+            processed_count = 0
+            filtered_count = 0
+            
+            # 以paper_id索引论文（dict保持原顺序），更新原地进行，过滤时直接删除对应项
+            papers_by_id = {paper.get('paper_id'): paper for paper in papers}
+            saved_count = len(papers)
+            
+            # 标题和摘要与缓存一致的论文直接使用缓存结果；其余论文按标题+摘要去重，
+            # 内容相同的论文只请求一次，结果分发给所有副本
+            pending = {}  # 缓存键 -> 内容相同的待处理论文列表
+            cached_count = 0
+            for paper_idx in papers_to_process:
+                paper = papers[paper_idx]
+                key = ResultCache.key(paper)
+                if key in pending:
+                    pending[key].append(paper)
+                    continue
+                cached = cache.get(key)
+                if cached is None:
+                    pending[key] = [paper]
+                    continue
+                cached_count += 1
+                processed_count += 1
+                if apply_result(paper, normalize_result(cached, config), whitelist_re):
+                    del papers_by_id[paper.get('paper_id')]
+                    filtered_count += 1
+            if cached_count:
+                logging.info(f"{cached_count} 篇论文命中缓存，无需请求LLM")
+            
+            # 按篇数和标题+摘要长度将去重后的论文打包成批，每批发送一次请求
+            keys_to_request = list(pending)
+            batches = pack_batches(
+                keys_to_request,
+                [len(pending[key][0].get('paper_title', '')) + len(pending[key][0].get('paper_abstract', ''))
+                 for key in keys_to_request],
+                batch_size
+            )
+            
+            # 多个批次的请求并发进行，结果在主线程中依次合并和保存
+            executor = ThreadPoolExecutor(max_workers=workers)
+            futures = {
+                executor.submit(process_papers_batch, [pending[key][0] for key in batch_keys], config): batch_keys
+                for batch_keys in batches
+            }
+            unsaved_count = cached_count
+            try:
+                for batch_count, future in enumerate(as_completed(futures), 1):
+                    batch_keys = futures[future]
+                    results = future.result()
                     
-                    should_filter = (not is_whitelisted and 
-                                   (paper_categories == ['Other'] or 
-                                    paper_topics == ['Other']))
+                    logging.info(f"完成批次 {batch_count}/{len(batches)}：{len(batch_keys)} 篇"
+                                 f"（{pending[batch_keys[0]][0].get('paper_title', '')[:40]}...）")
                     
-                    if should_filter:
-                        # 从副本中删除这篇论文
-                        papers_copy.pop(i)
-                        filtered_count += 1
-                        if paper_categories == ['Other']:
-                            print(f"⚠️ 论文被过滤并删除（非白名单且category仅为Other）")
-                        elif paper_topics == ['Other']:
-                            print(f"⚠️ 论文被过滤并删除（非白名单且topic仅为Other）")
+                    cache.put_many(zip(batch_keys, results))
+                    for key, result in zip(batch_keys, results):
+                        for paper in pending[key]:
+                            # 通过paper_id找到对应的论文并更新
+                            paper_id = paper.get('paper_id')
+                            if paper_id not in papers_by_id:
+                                continue
+                            
+                            processed_count += 1
+                            unsaved_count += 1
+                            if apply_result(paper, result, whitelist_re):
+                                # 删除这篇论文
+                                del papers_by_id[paper_id]
+                                filtered_count += 1
                     
-                    break
+                    # 累计处理若干篇后保存一次，既避免数据丢失，又不必每批都重写整个文件
+                    if unsaved_count >= SAVE_EVERY:
+                        save_papers_for_date(papers_dir, date_str, list(papers_by_id.values()), index, saved_count)
+                        saved_count = len(papers_by_id)
+                        unsaved_count = 0
+            finally:
+                # 正常结束或中途异常时，保存尚未写入的结果
+                if unsaved_count:
+                    save_papers_for_date(papers_dir, date_str, list(papers_by_id.values()), index, saved_count)
+                executor.shutdown(cancel_futures=True)
             
-            # 每处理一篇论文就保存一次（避免数据丢失）
-            save_papers_for_date(data_dir, date_str, papers_copy)
+            papers = list(papers_by_id.values())
             
-            # 添加延迟避免API速率限制
-            time.sleep(2)
-        
-        # 更新原始papers为最终的副本
-        papers = papers_copy
-        
-        print(f"\n日期 {date_str} 处理完成！")
-        print(f"  - 处理了 {processed_count} 个论文条目")
-        print(f"  - 过滤删除了 {filtered_count} 个论文条目")
-        print(f"  - 最终保留了 {len(papers)} 个论文条目")
+            logging.info(f"日期 {date_str} 处理完成：处理 {processed_count} 篇，"
+                         f"过滤删除 {filtered_count} 篇，最终保留 {len(papers)} 篇")
+    finally:
+        cache.close()
     
-    print(f"\n所有论文翻译和分类处理完成！")
+    logging.info(f"所有论文翻译和分类处理完成！")
 
 def main():
     parser = argparse.ArgumentParser(description='为论文进行完整处理：翻译和分类')
@@ -390,11 +665,15 @@ def main():
                         help='配置文件路径')
     parser.add_argument('--target-date', type=str, default=None,
                         help='目标日期，格式为YYYY-MM-DD，如果不指定则处理所有日期')
+    parser.add_argument('--batch-size', type=int, default=BATCH_SIZE,
+                        help='每次LLM请求处理的论文篇数上限')
+    parser.add_argument('--workers', type=int, default=MAX_WORKERS,
+                        help='同时进行中的LLM请求数')
     
     args = parser.parse_args()
     
-    print("开始论文翻译和分类处理...")
-    process_papers_classification(args.data_dir, args.config_path, args.target_date)
+    logging.info("开始论文翻译和分类处理...")
+    process_papers_classification(args.data_dir, args.config_path, args.target_date, args.batch_size, args.workers)
 
 if __name__ == "__main__":
     main()
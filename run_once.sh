@@ -5,25 +5,6 @@ set -e
 # 切到项目根目录（脚本所在目录）
 cd "$(dirname "$0")"
 
-echo "🚜 收集论文..."
-python daily_paper_collector.py
-
-echo "🈶 翻译论文..."
-python llm_process.py
-
-echo "🧹 清理空JSON..."
-python cleanup_empty_papers.py
-
-echo "📝 提交与推送..."
-if [ -n "$(git status --porcelain)" ]; then
-  git add -A
-  git commit -m 'Auto update: daily papers, translations, cleanup'
-  git push
-  echo "✅ 已提交并推送。"
-else
-  echo "ℹ️ 无变更，无需提交。"
-fi
-
-echo "🎉 完成。"
-
-
+# 立即执行一次每日任务：收集、翻译、清理、提交与推送，步骤定义统一在 scheduler.py 中
+# 手动补跑不受定时任务的步骤超时和总时间预算限制，各步骤输出直接显示在终端
+exec python scheduler.py --once
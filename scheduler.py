@@ -1,7 +1,8 @@
 #!/usr/bin/env python3
 """
 定时任务调度器
-每天北京时间上午10点和中午12点执行论文收集和翻译任务
+每天北京时间上午10点和中午12点执行论文收集和翻译任务；使用 --once 立即执行一次后退出
+（--once 用于手动补跑，不设步骤超时和总时间预算，各步骤输出直接显示在终端）
 """
 
 import schedule
@@ -10,8 +11,9 @@ import subprocess
 import logging
 import os
 import sys
-from datetime import datetime
-import pytz
+import argparse
+from datetime import datetime, timezone
+from zoneinfo import ZoneInfo
 
 # 设置日志
 logging.basicConfig(
@@ -26,18 +28,36 @@ logging.basicConfig(
 logger = logging.getLogger(__name__)
 
 # 设置北京时区
-beijing_tz = pytz.timezone('Asia/Shanghai')
+beijing_tz = ZoneInfo('Asia/Shanghai')
 
-def run_command(command, description):
-    """执行命令并记录结果"""
+# 空闲时单次休眠的最长时间（秒），保证进程能及时响应信号
+MAX_IDLE_SECONDS = 3600
+# 单个步骤的最长执行时间（秒），仅对定时任务生效
+STEP_TIMEOUT = 3600
+# 一次每日任务所有步骤的总时间预算（秒），不超过两次定时任务的间隔，避免拖到下一次任务；仅对定时任务生效
+DAILY_TASK_BUDGET = 2 * 3600
+
+def run_command(command, description, deadline=None, limited=True):
+    """执行命令并记录结果，command为参数列表，直接执行而不经过shell
+    
+    deadline为time.monotonic()时间点，步骤超时取STEP_TIMEOUT与剩余预算中较小者。
+    limited为False时不设超时，也不捕获输出，子进程的输出直接显示在终端。
+    """
+    timeout = STEP_TIMEOUT if limited else None
+    if deadline is not None:
+        remaining = deadline - time.monotonic()
+        timeout = remaining if timeout is None else min(timeout, remaining)
+        if timeout <= 0:
+            logger.error(f"❌ {description} 未执行：每日任务时间预算已用完")
+            return False
+    
     try:
         logger.info(f"开始执行: {description}")
         result = subprocess.run(
             command, 
-            shell=True, 
-            capture_output=True, 
+            capture_output=limited, 
             text=True,
-            timeout=3600  # 1小时超时
+            timeout=timeout
         )
         
         if result.returncode == 0:
@@ -46,7 +66,8 @@ def run_command(command, description):
                 logger.info(f"输出: {result.stdout.strip()}")
         else:
             logger.error(f"❌ {description} 执行失败")
-            logger.error(f"错误信息: {result.stderr}")
+            if result.stderr:
+                logger.error(f"错误信息: {result.stderr}")
             return False
             
     except subprocess.TimeoutExpired:
@@ -58,8 +79,12 @@ def run_command(command, description):
     
     return True
 
-def daily_task():
-    """每日定时任务"""
+def daily_task(limited=True):
+    """每日定时任务，全部步骤成功时返回True
+    
+    limited为False时（手动执行 --once）不设步骤超时和总时间预算，并直接输出各步骤的日志。
+    """
+    deadline = time.monotonic() + DAILY_TASK_BUDGET if limited else None
     beijing_time = datetime.now(beijing_tz)
     logger.info(f"🚀 开始执行每日任务 - 北京时间: {beijing_time.strftime('%Y-%m-%d %H:%M:%S')}")
     
@@ -68,40 +93,62 @@ def daily_task():
     os.chdir(script_dir)
     logger.info(f"工作目录: {script_dir}")
     
-    # 任务执行步骤
+    # 任务执行步骤（用当前解释器运行各脚本，每个脚本仍在独立进程中执行）
     steps = [
-        ("python daily_paper_collector.py", "收集每日论文"),
-        ("python llm_process.py", "批量翻译论文"),
-        ("python cleanup_empty_papers.py", "清理空日度JSON"),
-        ("git add -A", "添加所有变更到暂存区"),
-        ("git commit -m 'Auto update: daily papers and translations'", "提交变更"),
-        ("git push", "推送到远程仓库")
+        ([sys.executable, "daily_paper_collector.py"], "收集每日论文"),
+        ([sys.executable, "llm_process.py"], "批量翻译论文"),
+        ([sys.executable, "cleanup_empty_papers.py"], "清理空日度JSON"),
+    ]
+    # 暂存、提交、推送作为一个步骤依次执行；工作目录干净时整步跳过
+    git_commands = [
+        (["git", "add", "-A"], "添加所有变更到暂存区"),
+        (["git", "commit", "-m", "Auto update: daily papers and translations"], "提交变更"),
+        (["git", "push"], "推送到远程仓库"),
     ]
     
     success_count = 0
     for command, description in steps:
-        if run_command(command, description):
+        if run_command(command, description, deadline, limited):
             success_count += 1
         else:
             logger.error(f"任务失败，停止后续执行")
             break
+    else:
+        if not check_git_status():
+            logger.info("跳过: 提交并推送到远程仓库")
+            success_count += 1
+        elif all(run_command(command, description, deadline, limited) for command, description in git_commands):
+            success_count += 1
     
-    logger.info(f"📊 任务完成统计: {success_count}/{len(steps)} 步骤成功执行")
+    logger.info(f"📊 任务完成统计: {success_count}/{len(steps) + 1} 步骤成功执行")
     logger.info("=" * 50)
+    return success_count == len(steps) + 1
 
 def check_git_status():
-    """检查Git状态"""
+    """检查Git状态，返回是否存在未提交的变更（检查失败时按有变更处理）"""
     try:
-        result = subprocess.run("git status --porcelain", shell=True, capture_output=True, text=True)
+        result = subprocess.run(["git", "status", "--porcelain"], capture_output=True, text=True)
         if result.stdout.strip():
             logger.info("检测到未提交的变更")
+            return True
         else:
             logger.info("工作目录干净，无需提交")
+            return False
     except Exception as e:
         logger.warning(f"检查Git状态失败: {str(e)}")
+        return True
 
 def main():
     """主函数"""
+    parser = argparse.ArgumentParser(description='论文收集定时任务调度器')
+    parser.add_argument('--once', action='store_true',
+                        help='立即执行一次每日任务后退出（任务失败时返回非零退出码）；'
+                             '不设步骤超时和总时间预算，各步骤输出直接显示在终端')
+    args = parser.parse_args()
+    
+    if args.once:
+        sys.exit(0 if daily_task(limited=False) else 1)
+    
     logger.info("🎯 论文收集定时任务调度器启动")
     logger.info("📅 任务时间: 每天北京时间 10:00 和 12:00")
     
@@ -110,46 +157,26 @@ def main():
     schedule.every().day.at("02:00").do(daily_task)  # UTC 02:00 = 北京时间 10:00
     schedule.every().day.at("04:00").do(daily_task)  # UTC 04:00 = 北京时间 12:00
     
-    # 显示下次执行时间
-    next_run = schedule.next_run()
-    if next_run:
-        beijing_next_run = next_run.replace(tzinfo=pytz.UTC).astimezone(beijing_tz)
-        logger.info(f"⏰ 下次执行时间: {beijing_next_run.strftime('%Y-%m-%d %H:%M:%S')} (北京时间)")
-    
     # 检查当前Git状态
     check_git_status()
     
-    # 主循环
+    # 主循环：直接休眠到下次任务到期，不再每分钟轮询
     try:
+        last_next_run = None
         while True:
             schedule.run_pending()
             
-            # 显示距离下次任务的时间
+            # 下次执行时间变化时（启动时及每次任务执行后）显示一次
             next_run = schedule.next_run()
-            if next_run:
-                # 获取当前UTC时间（不带时区信息，与schedule库保持一致）
-                now = datetime.utcnow()
-                time_until_next = next_run - now
-                
-                # 转换为北京时间显示
-                beijing_next_run = next_run.replace(tzinfo=pytz.UTC).astimezone(beijing_tz)
-                beijing_now = now.replace(tzinfo=pytz.UTC).astimezone(beijing_tz)
-                
-                # 计算剩余时间
-                total_seconds = int(time_until_next.total_seconds())
-                if total_seconds < 0:
-                    total_seconds = 0  # 防止负数时间
-                
-                hours = total_seconds // 3600
-                minutes = (total_seconds % 3600) // 60
-                seconds = total_seconds % 60
-                
-                logger.info(f"⏰ 当前时间: {beijing_now.strftime('%Y-%m-%d %H:%M:%S')} (北京时间)")
-                logger.info(f"📅 下次任务: {beijing_next_run.strftime('%Y-%m-%d %H:%M:%S')} (北京时间)")
-                logger.info(f"⏳ 距离下次执行还有: {hours}小时 {minutes}分钟 {seconds}秒")
-                logger.info("-" * 40)
+            if next_run and next_run != last_next_run:
+                beijing_next_run = next_run.replace(tzinfo=timezone.utc).astimezone(beijing_tz)
+                logger.info(f"⏰ 下次执行时间: {beijing_next_run.strftime('%Y-%m-%d %H:%M:%S')} (北京时间)")
+                last_next_run = next_run
             
-            time.sleep(60)  # 每分钟检查一次
+            idle_seconds = schedule.idle_seconds()
+            if idle_seconds is None:
+                idle_seconds = MAX_IDLE_SECONDS
+            time.sleep(min(max(idle_seconds, 0), MAX_IDLE_SECONDS))
     except KeyboardInterrupt:
         logger.info("👋 接收到停止信号，正在退出...")
     except Exception as e:
@@ -0,0 +1,74 @@
+#!/usr/bin/env python3
+# -*- coding: utf-8 -*-
+"""
+列表页解析的回归检查：用保存的arXiv列表页样例校验 extract_global_date 和 parse_papers_from_html。
+
+运行：python -m unittest discover -s tests（在项目根目录执行）
+"""
+
+import os
+import sys
+import tempfile
+import unittest
+
+ROOT_DIR = os.path.dirname(os.path.dirname(os.path.abspath(__file__)))
+sys.path.insert(0, ROOT_DIR)
+
+from daily_paper_collector import DailyPaperCollector
+
+FIXTURE_FILE = os.path.join(ROOT_DIR, 'tests', 'fixtures', 'listing_cs_sd.html')
+
+
+class ListingParserTest(unittest.TestCase):
+    def setUp(self):
+        # 收集器初始化时会创建数据目录，放到临时目录中避免改动 data/
+        self.tmp_dir = tempfile.TemporaryDirectory()
+        self.collector = DailyPaperCollector(data_dir=self.tmp_dir.name)
+        with open(FIXTURE_FILE, 'rb') as f:
+            self.html_content = f.read()
+
+    def tearDown(self):
+        self.collector.session.close()
+        self.tmp_dir.cleanup()
+
+    def test_extract_global_date(self):
+        self.assertEqual(self.collector.extract_global_date(self.html_content), '2025-09-10')
+        self.assertIsNone(self.collector.extract_global_date(b'<html><body></body></html>'))
+
+    def test_parse_papers_from_html(self):
+        papers = self.collector.parse_papers_from_html(self.html_content, '2025-09-10')
+
+        # 新提交和交叉列表都保留，Replacement部分的论文被跳过
+        self.assertEqual([p['paper_id'] for p in papers], ['2509.01234', '2509.05678', '2509.09999'])
+
+        first, second, cross = papers
+        self.assertEqual(first['paper_title'], 'A Study of Speech Codecs & Things')
+        self.assertEqual(first['paper_authors'], 'Alice Zhang, José Müller')
+        self.assertEqual(first['subjects'], [
+            'Sound (cs.SD)',
+            'Audio and Speech Processing (eess.AS)',
+            'Machine Learning (cs.LG)',
+        ])
+        self.assertEqual(' '.join(first['paper_abstract'].split()), 'We study speech codecs. Results are good.')
+
+        self.assertEqual(second['paper_abstract'], 'Music <generation> abstract.')
+        self.assertEqual(second['subjects'], ['Sound (cs.SD)'])
+
+        # 带连字符的分类代码（hep-th）及名称中的 " - " 不能被截断
+        self.assertEqual(cross['paper_authors'], 'Dan Q, Eve R')
+        self.assertEqual(cross['subjects'], [
+            'Computation and Language (cs.CL)',
+            'Sound (cs.SD)',
+            'High Energy Physics - Theory (hep-th)',
+        ])
+
+        for paper in papers:
+            self.assertEqual(paper['update_time'], '2025-09-10')
+            self.assertEqual(paper['paper_title_zh'], '')
+            self.assertEqual(paper['paper_abstract_zh'], '')
+            self.assertEqual(paper['topic'], [])
+            self.assertEqual(paper['category'], [])
+
+
+if __name__ == '__main__':
+    unittest.main()